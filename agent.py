@@ -2,29 +2,60 @@
 PRLens Agent - LangGraph-based PR Review Agent
 
 This module implements the review workflow as a state machine using LangGraph.
-Three specialised reviewers (security, quality, general) run in parallel,
-their findings are merged and deduplicated, then optionally posted to GitHub.
+Every changed file is fanned out (via LangGraph ``Send``) to three specialised
+reviewers (security, quality, general) which run in parallel; their findings
+are merged and deduplicated, then optionally posted to GitHub.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import operator
 import re
+import sys
+from collections import defaultdict
 from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import PurePosixPath
+from typing import Annotated
 
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
 
-import config as _config  # noqa: F401 — ensures env & logging are initialised
+from cache import cache_key, get_cached, set_cached
+from config import (  # also ensures env & logging are initialised
+    MAX_CONCURRENCY,
+    OUTPUT_JSON,
+    SKIP_TRIVIAL_FILES,
+)
 from diff_parser import (
+    DiffStreamParser,
     FileDiff,
     filter_files,
     get_review_content,
-    parse_diff,
+    should_review_file,
 )
 from github_client import (
     ReviewSubmission,
-    fetch_raw_diff,
+    close_http_client,
+    fetch_pr_metadata,
     post_review,
+    stream_raw_diff,
+)
+from models import Finding, ReviewResult
+from reviewer import (
+    MAX_CHARS_PER_BATCH,
+    MAX_FILES_PER_BATCH,
+    analyze_code,
+    analyze_code_batch,
+    is_large_file,
+    quality_review,
+    quality_review_batch,
+    security_review,
+    security_review_batch,
 )
-from models import Finding
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +63,7 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # STATE DEFINITION
 # =============================================================================
-@dataclass
+@dataclass(slots=True)
 class ReviewState:
     """
     State that flows through the review graph.
@@ -45,14 +76,22 @@ class ReviewState:
     repo: str  # e.g., "kulbir/PRLens"
     pr_number: int  # e.g., 1
 
-    # Intermediate data (populated by nodes)
-    diff: str = ""  # Raw diff content
+    # Intermediate data (populated by nodes). The raw diff is parsed in
+    # fetch_pr_data and not kept, so it isn't copied into every checkpoint.
     files_to_review: list[FileDiff] = field(default_factory=list)
+    head_sha: str = ""  # PR head commit, so posting needs no extra lookup
 
-    # Results from specialised reviewers (each reviewer writes to its own field)
-    security_findings: list[Finding] = field(default_factory=list)
-    quality_findings: list[Finding] = field(default_factory=list)
-    general_findings: list[Finding] = field(default_factory=list)
+    # Results from specialised reviewers (each reviewer writes to its own field;
+    # per-file tasks run concurrently, so updates are concatenated)
+    security_findings: Annotated[list[Finding], operator.add] = field(
+        default_factory=list
+    )
+    quality_findings: Annotated[list[Finding], operator.add] = field(
+        default_factory=list
+    )
+    general_findings: Annotated[list[Finding], operator.add] = field(
+        default_factory=list
+    )
 
     # Merged AI analysis results (populated by merge_findings node)
     findings: list[Finding] = field(default_factory=list)
@@ -64,15 +103,31 @@ class ReviewState:
     error: str | None = None  # Error message if something failed
 
 
+@dataclass(slots=True)
+class ReviewTask:
+    """Input for a reviewer node, dispatched via ``Send``.
+
+    Holds either one large file or a batch of small files that are
+    reviewed together in a single LLM request.
+    """
+
+    files: list[FileDiff]
+    # filename → other files with identical added code (findings are replayed)
+    duplicates: dict[str, list[str]] = field(default_factory=dict)
+
+
 # =============================================================================
 # NODE FUNCTIONS
 # =============================================================================
-def fetch_pr_data(state: ReviewState) -> dict:
+async def fetch_pr_data(state: ReviewState) -> dict:
     """
-    Node 1: Fetch PR diff from GitHub.
+    Node 1: Fetch PR diff and metadata from GitHub.
+
+    Both requests are in flight at once, so this takes about as long as
+    the slower of the two.
 
     Reads: repo, pr_number
-    Updates: diff, files_to_review, error
+    Updates: files_to_review (with ``code`` filled in), head_sha, error
     """
     repo = state.repo
     pr_number = state.pr_number
@@ -80,114 +135,218 @@ def fetch_pr_data(state: ReviewState) -> dict:
     logger.info("📥 Fetching PR #%d from %s...", pr_number, repo)
 
     try:
-        raw_diff = fetch_raw_diff(repo, pr_number)
-        all_files = parse_diff(raw_diff)
-        files_to_review = filter_files(all_files)
+        # PyGithub is blocking, so the metadata call runs in a worker thread
+        metadata, all_files = await asyncio.gather(
+            asyncio.to_thread(fetch_pr_metadata, repo, pr_number),
+            _read_diff(repo, pr_number),
+        )
+        files_to_review = filter_files(
+            all_files, include_trivial=not SKIP_TRIVIAL_FILES
+        )
+
+        # Extract the review text once; planning and every reviewer reuse it
+        for file in files_to_review:
+            file.code = get_review_content(file)["code"]
 
         logger.info(
-            "   Found %d files, %d to review",
+            "   Found %d candidate files, %d to review",
             len(all_files),
             len(files_to_review),
         )
 
-        return {
-            "diff": raw_diff,
-            "files_to_review": files_to_review,
-        }
+        if not files_to_review:
+            return {
+                "files_to_review": [],
+                "head_sha": metadata.head_sha,
+                "summary": "No reviewable files in this PR.",
+            }
+
+        return {"files_to_review": files_to_review, "head_sha": metadata.head_sha}
 
     except Exception as e:
         logger.error("Failed to fetch PR: %s", e)
         return {
             "error": str(e),
-            "diff": "",
             "files_to_review": [],
         }
 
 
+async def _read_diff(repo: str, pr_number: int) -> list[FileDiff]:
+    """
+    Stream the PR diff, parsing each file as soon as it has arrived.
+
+    Files skipped by name (lockfiles, vendored code, ...) are dropped
+    before their hunks are scanned.
+    """
+    parser = DiffStreamParser(path_filter=should_review_file)
+    files = []
+    async for chunk in stream_raw_diff(repo, pr_number):
+        files.extend(parser.feed(chunk))
+    files.extend(parser.close())
+    return files
+
+
 # ---------------------------------------------------------------------------
 # Generic reviewer helper
 # ---------------------------------------------------------------------------
-def _run_reviewer(
-    state: ReviewState,
+async def _review_pending(
+    pending: list[tuple[str, str]],
     review_fn,
+    batch_fn,
+    label: str,
+) -> dict[str, ReviewResult]:
+    """
+    Review (code, filename) pairs, batching them into one request if possible.
+
+    Falls back to concurrent single-file calls if the batch request fails,
+    and for any file the batch response leaves out.
+    """
+    results: dict[str, ReviewResult] = {}
+    if len(pending) > 1:
+        logger.info("%s Analysing batch of %d files...", label, len(pending))
+        try:
+            batch = await batch_fn(pending)
+            error = "no usable response"
+        except Exception as e:
+            batch = None
+            error = str(e)
+        if batch is None:
+            logger.warning(
+                "   %s Batch failed (%s), reviewing files one by one", label, error
+            )
+        else:
+            results = batch
+            pending = [(c, f) for c, f in pending if f not in results]
+            if pending:
+                logger.warning(
+                    "   %s Batch response missed %d file(s), reviewing them one by one",
+                    label,
+                    len(pending),
+                )
+
+    async def review_one(code: str, filename: str) -> ReviewResult | None:
+        logger.info("%s Analysing %s...", label, filename)
+        try:
+            return await review_fn(code, filename)
+        except Exception as e:
+            logger.warning("   %s failed for %s: %s", label, filename, e)
+            return None
+
+    outcomes = await asyncio.gather(*(review_one(c, f) for c, f in pending))
+    results.update(
+        (filename, result)
+        for (_, filename), result in zip(pending, outcomes, strict=True)
+        if result is not None
+    )
+    return results
+
+
+async def _run_reviewer(
+    task: ReviewTask,
+    review_fn,
+    batch_fn,
     findings_key: str,
     label: str,
 ) -> dict:
     """
-    Run *review_fn* over every reviewable file and collect findings.
+    Run a reviewer over the files carried by *task* and collect findings.
+
+    Results are cached on disk by content hash, so unchanged files are not
+    re-sent to the LLM on re-runs. Remaining files go out as one batched
+    request when *task* holds more than one. Findings are copied to any
+    duplicates of a reviewed file. Near-identical findings on the same line
+    are collapsed before they are returned.
 
     Args:
-        state: Current graph state
-        review_fn: Callable(code: str, filename: str) -> ReviewResult | None
+        task: The file(s) to review (see ``plan_reviews``)
+        review_fn: Async callable(code: str, filename: str) -> ReviewResult | None
+        batch_fn: Async callable(list[(code, filename)]) -> dict[str, ReviewResult]
         findings_key: State key to write the results to
         label: Emoji / text prefix used in log messages
     """
-    files = state.files_to_review
+    results: dict[str, ReviewResult] = {}
+    pending: list[tuple[str, str]] = []
+    keys: dict[str, str] = {}
+
+    for file in task.files:
+        code = file.code
+        key = cache_key(review_fn.__name__, code, file.filename)
+        cached = get_cached(key)
+        if cached is not None:
+            logger.info("%s Cache hit for %s", label, file.filename)
+            results[file.filename] = cached
+        else:
+            keys[file.filename] = key
+            pending.append((code, file.filename))
+
+    if pending:
+        fresh = await _review_pending(pending, review_fn, batch_fn, label)
+        for filename, result in fresh.items():
+            if filename in keys:
+                # A partial review is reported but not cached, so the next
+                # run retries the whole file
+                if result.complete:
+                    set_cached(keys[filename], result)
+                results[filename] = result
+
+    findings: list[Finding] = []
+    for filename, result in results.items():
+        for finding in result.findings:
+            finding.path = filename
+        findings.extend(result.findings)
+        for duplicate in task.duplicates.get(filename, []):
+            findings.extend(
+                finding.model_copy(update={"path": duplicate})
+                for finding in result.findings
+            )
+
+    # Drop this reviewer's own repeats before they go into graph state;
+    # merge_findings still removes duplicates across reviewers
+    findings = _dedup_findings(findings)
 
-    if state.error or not files:
-        return {findings_key: []}
-
-    logger.info("%s Analysing %d file(s)...", label, len(files))
-
-    all_findings: list[Finding] = []
-
-    for file in files:
-        review_content = get_review_content(file)
-        code = review_content["code"]
-
-        if not code.strip():
-            continue
-
-        try:
-            result = review_fn(code, file.filename)
-            if result and result.findings:
-                for finding in result.findings:
-                    finding.path = file.filename
-                all_findings.extend(result.findings)
-        except Exception as e:
-            logger.warning("   %s failed for %s: %s", label, file.filename, e)
-
-    logger.info("   %s Found %d issue(s)", label, len(all_findings))
-    return {findings_key: all_findings}
+    logger.info(
+        "   %s Found %d issue(s) in %d file(s)", label, len(findings), len(task.files)
+    )
+    return {findings_key: findings}
 
 
 # =============================================================================
 # SPECIALISED REVIEWER NODES
 # =============================================================================
-def security_reviewer(state: ReviewState) -> dict:
+async def security_reviewer(task: ReviewTask) -> dict:
     """
     Security Reviewer Node: Focuses ONLY on security vulnerabilities.
 
-    Reads: files_to_review
+    Reads: files (from ReviewTask)
     Writes: security_findings
     """
-    from reviewer import security_review
-
-    return _run_reviewer(state, security_review, "security_findings", "🔒")
+    return await _run_reviewer(
+        task, security_review, security_review_batch, "security_findings", "🔒"
+    )
 
 
-def quality_reviewer(state: ReviewState) -> dict:
+async def quality_reviewer(task: ReviewTask) -> dict:
     """
     Quality Reviewer Node: Focuses ONLY on code quality / maintainability.
 
-    Reads: files_to_review
+    Reads: files (from ReviewTask)
     Writes: quality_findings
     """
-    from reviewer import quality_review
-
-    return _run_reviewer(state, quality_review, "quality_findings", "📐")
+    return await _run_reviewer(
+        task, quality_review, quality_review_batch, "quality_findings", "📐"
+    )
 
 
-def general_reviewer(state: ReviewState) -> dict:
+async def general_reviewer(task: ReviewTask) -> dict:
     """
     General Reviewer Node: Catches bugs, performance, and style issues.
 
-    Reads: files_to_review
+    Reads: files (from ReviewTask)
     Writes: general_findings
     """
-    from reviewer import analyze_code
-
-    return _run_reviewer(state, analyze_code, "general_findings", "🔍")
+    return await _run_reviewer(
+        task, analyze_code, analyze_code_batch, "general_findings", "🔍"
+    )
 
 
 # =============================================================================
@@ -201,22 +360,44 @@ _SEVERITY_ORDER: dict[str, int] = {
 }
 
 
+def _severity_rank(finding: Finding) -> int:
+    """Sort key: CRITICAL (0) first.
+
+    ``Finding.severity`` is validated against the same four values, so a
+    plain lookup is enough — no fallback rank needed.
+    """
+    return _SEVERITY_ORDER[finding.severity]
+
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=4096)
 def _normalise(text: str) -> str:
     """Lower-case, collapse whitespace, strip punctuation for fuzzy matching."""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s]", "", text)
-    return re.sub(r"\s+", " ", text)
+    text = _PUNCT_RE.sub("", text.lower().strip())
+    return _WHITESPACE_RE.sub(" ", text)
 
 
-def _words(text: str) -> set[str]:
+@functools.lru_cache(maxsize=4096)
+def _words(text: str) -> frozenset[str]:
     """Return the set of meaningful words (length ≥ 3) in *text*."""
-    return {w for w in _normalise(text).split() if len(w) >= 3}
+    return frozenset(w for w in _normalise(text).split() if len(w) >= 3)
+
 
+def _is_similar(
+    desc_a: str,
+    words_a: frozenset[str],
+    desc_b: str,
+    words_b: frozenset[str],
+    threshold: float = 0.6,
+) -> bool:
+    """Check whether two descriptions are similar using word-overlap ratio.
 
-def _is_similar(desc_a: str, desc_b: str, threshold: float = 0.6) -> bool:
-    """Check whether two descriptions are similar using word-overlap ratio."""
-    words_a = _words(desc_a)
-    words_b = _words(desc_b)
+    *words_a* / *words_b* are the descriptions' ``_words``, computed once
+    per finding by the caller rather than on every comparison.
+    """
     if not words_a or not words_b:
         return desc_a[:50] == desc_b[:50]
     overlap = len(words_a & words_b)
@@ -232,34 +413,37 @@ def _dedup_findings(all_findings: list[Finding]) -> list[Finding]:
     file path and line number **and** their descriptions are similar
     (≥ 60 % word overlap).
     """
-    # Bucket by (path, line) for efficient comparison
-    buckets: dict[tuple[str | None, int | None], list[Finding]] = {}
+    # Bucket by (path, line) for efficient comparison; each finding's word
+    # set is computed once here instead of inside every pairwise comparison
+    buckets: defaultdict[
+        tuple[str | None, int | None], list[tuple[Finding, frozenset[str]]]
+    ] = defaultdict(list)
     for finding in all_findings:
         key = (finding.path, finding.line)
-        buckets.setdefault(key, []).append(finding)
+        buckets[key].append((finding, _words(finding.description)))
 
     unique: list[Finding] = []
 
     for group in buckets.values():
         # Within each bucket, merge similar descriptions
-        merged: list[Finding] = []
-        for finding in group:
+        merged: list[tuple[Finding, frozenset[str]]] = []
+        for finding, words in group:
             duplicate_of = None
-            for existing in merged:
-                if _is_similar(finding.description, existing.description):
+            for existing, existing_words in merged:
+                if _is_similar(
+                    finding.description, words, existing.description, existing_words
+                ):
                     duplicate_of = existing
                     break
 
             if duplicate_of is None:
-                merged.append(finding)
+                merged.append((finding, words))
             else:
                 # Keep the higher severity
-                dup_rank = _SEVERITY_ORDER.get(duplicate_of.severity, 4)
-                new_rank = _SEVERITY_ORDER.get(finding.severity, 4)
-                if new_rank < dup_rank:
+                if _severity_rank(finding) < _severity_rank(duplicate_of):
                     duplicate_of.severity = finding.severity
 
-        unique.extend(merged)
+        unique.extend(finding for finding, _ in merged)
 
     return unique
 
@@ -280,17 +464,15 @@ def merge_findings(state: ReviewState) -> dict:
     logger.info("🔀 Merging findings from all reviewers...")
 
     # Combine all findings
-    all_findings = (
-        list(state.security_findings)
-        + list(state.quality_findings)
-        + list(state.general_findings)
+    all_findings = list(
+        chain(state.security_findings, state.quality_findings, state.general_findings)
     )
 
     # Deduplicate
     unique_findings = _dedup_findings(all_findings)
 
     # Sort by severity
-    unique_findings.sort(key=lambda f: _SEVERITY_ORDER.get(f.severity, 4))
+    unique_findings.sort(key=_severity_rank)
 
     # Generate summary
     security_count = len(state.security_findings)
@@ -404,11 +586,11 @@ def format_findings_markdown(state: ReviewState) -> str:
     return "\n".join(lines)
 
 
-def post_review_node(state: ReviewState) -> dict:
+async def post_review_node(state: ReviewState) -> dict:
     """
     Node 3: Post review comments to GitHub.
 
-    Reads: repo, pr_number, findings, summary, *_findings
+    Reads: repo, pr_number, head_sha, findings, summary, *_findings
     Updates: review_posted, review_id, error
     """
     logger.info("📝 Posting review to GitHub...")
@@ -422,7 +604,9 @@ def post_review_node(state: ReviewState) -> dict:
             comments=[],  # Inline comments can be added later
         )
 
-        review_id = post_review(state.repo, state.pr_number, review)
+        review_id = await post_review(
+            state.repo, state.pr_number, review, commit_id=state.head_sha or None
+        )
 
         logger.info("   ✅ Posted review #%d", review_id)
 
@@ -442,6 +626,121 @@ def post_review_node(state: ReviewState) -> dict:
 # =============================================================================
 # DECISION FUNCTIONS (for conditional edges)
 # =============================================================================
+REVIEWER_NODES: tuple[str, ...] = (
+    "security_reviewer",
+    "quality_reviewer",
+    "general_reviewer",
+)
+
+
+def _group_identical(
+    files: list[FileDiff],
+) -> tuple[list[FileDiff], dict[str, list[str]]]:
+    """
+    Collapse files whose added code is byte-identical.
+
+    Only files with the same extension are grouped: the filename is part of
+    the prompt, so e.g. the same text in ``.py`` and ``.js`` is reviewed
+    separately.
+
+    Returns:
+        One representative file per distinct code blob, and a mapping of
+        representative filename → filenames of its duplicates
+    """
+    groups: dict[tuple[str, str], list[FileDiff]] = {}
+    for file in files:
+        digest = hashlib.sha256(file.code.encode()).hexdigest()
+        key = (PurePosixPath(file.filename).suffix, digest)
+        groups.setdefault(key, []).append(file)
+
+    representatives = [group[0] for group in groups.values()]
+    duplicates = {
+        group[0].filename: [f.filename for f in group[1:]]
+        for group in groups.values()
+        if len(group) > 1
+    }
+    return representatives, duplicates
+
+
+def _batch_files(files: list[FileDiff]) -> list[list[FileDiff]]:
+    """
+    Greedily pack small files into batches that fit one LLM request.
+
+    Files at or above ``MAX_CHARS_PER_BATCH``, or large enough to need
+    chunking (``is_large_file``), get a batch of their own and take the
+    regular single-file / chunked path.
+    """
+    batches: list[list[FileDiff]] = []
+    current: list[FileDiff] = []
+    current_chars = 0
+
+    for file in files:
+        size = len(file.code)
+        if size >= MAX_CHARS_PER_BATCH or is_large_file(file.code):
+            batches.append([file])
+            continue
+
+        if current and (
+            current_chars + size > MAX_CHARS_PER_BATCH
+            or len(current) >= MAX_FILES_PER_BATCH
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+
+        current.append(file)
+        current_chars += size
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def plan_reviews(state: ReviewState) -> list[Send] | str:
+    """
+    Fan out one reviewer task per (batch of files, reviewer) pair.
+
+    Returns:
+        A ``Send`` for every pair, so LangGraph runs them concurrently
+        END if the fetch failed or every file was filtered out
+    """
+    if state.error or not state.files_to_review:
+        logger.info("🔀 Decision: Nothing to review → ending")
+        return END
+
+    files, duplicates = _group_identical(state.files_to_review)
+    if duplicates:
+        logger.info(
+            "   Skipping %d file(s) with identical content",
+            len(state.files_to_review) - len(files),
+        )
+
+    batches = _batch_files(files)
+
+    logger.info(
+        "🔀 Decision: fanning out %d file(s) in %d batch(es) to %d reviewers",
+        len(state.files_to_review),
+        len(batches),
+        len(REVIEWER_NODES),
+    )
+    return [
+        Send(
+            node,
+            ReviewTask(
+                files=batch,
+                duplicates={
+                    f.filename: duplicates[f.filename]
+                    for f in batch
+                    if f.filename in duplicates
+                },
+            ),
+        )
+        for batch in batches
+        for node in REVIEWER_NODES
+    ]
+
+
 def should_post_review(state: ReviewState) -> str:
     """
     Decide whether to post a review or end.
@@ -478,15 +777,16 @@ def build_review_graph() -> StateGraph:
     # Edges
     graph.add_edge(START, "fetch_pr_data")
 
-    # fetch → ALL reviewers (parallel execution)
-    graph.add_edge("fetch_pr_data", "security_reviewer")
-    graph.add_edge("fetch_pr_data", "quality_reviewer")
-    graph.add_edge("fetch_pr_data", "general_reviewer")
+    # fetch → one task per (batch of files, reviewer) pair (parallel execution),
+    # or straight to END when there is nothing to review
+    graph.add_conditional_edges(
+        "fetch_pr_data",
+        plan_reviews,
+        [*REVIEWER_NODES, END],
+    )
 
-    # ALL reviewers → merge (waits for all to complete)
-    graph.add_edge("security_reviewer", "merge_findings")
-    graph.add_edge("quality_reviewer", "merge_findings")
-    graph.add_edge("general_reviewer", "merge_findings")
+    # ALL reviewers → merge (barrier: waits for every reviewer to complete)
+    graph.add_edge(list(REVIEWER_NODES), "merge_findings")
 
     # Conditional edge: after merge, decide what to do
     graph.add_conditional_edges(
@@ -504,16 +804,49 @@ def build_review_graph() -> StateGraph:
     return graph
 
 
+@functools.lru_cache(maxsize=1)
 def create_agent():
-    """Create and compile the review agent."""
+    """Create and compile the review agent (once per process).
+
+    The graph topology is static, so the compiled agent is reused across
+    invocations. At most ``MAX_CONCURRENCY`` reviewer tasks run at the
+    same time.
+    """
     graph = build_review_graph()
-    return graph.compile()
+    return graph.compile().with_config(max_concurrency=MAX_CONCURRENCY)
 
 
 # =============================================================================
 # MAIN
 # =============================================================================
-if __name__ == "__main__":
+async def _print_json(agent, initial_state: ReviewState) -> None:
+    """Run the agent to completion and write the result to stdout as JSON."""
+    try:
+        final = await agent.ainvoke(initial_state)
+    finally:
+        await close_http_client()
+
+    json.dump(
+        {
+            "repo": initial_state.repo,
+            "pr_number": initial_state.pr_number,
+            "summary": final.get("summary", ""),
+            "findings": [f.model_dump() for f in final.get("findings", [])],
+            "review_posted": final.get("review_posted", False),
+            "review_id": final.get("review_id"),
+            "error": final.get("error"),
+        },
+        sys.stdout,
+    )
+    sys.stdout.write("\n")
+
+
+async def main() -> None:
+    """Run the agent on a PR, logging each node's update as it arrives.
+
+    With ``PRLENS_JSON=true`` only the final result is written to stdout,
+    as JSON, for CI and other programs to consume.
+    """
     agent = create_agent()
 
     initial_state = ReviewState(
@@ -521,17 +854,44 @@ if __name__ == "__main__":
         pr_number=1,
     )
 
+    if OUTPUT_JSON:
+        await _print_json(agent, initial_state)
+        return
+
     logger.info(
         "🤖 Running PRLens agent on %s PR #%d",
         initial_state.repo,
         initial_state.pr_number,
     )
-    final_state = agent.invoke(initial_state)
 
-    summary = final_state.get("summary", "")
-    error = final_state.get("error")
+    summary = ""
+    error: str | None = None
+
+    # "updates" yields {node_name: update} as soon as each node (or each
+    # fanned-out reviewer task) finishes, instead of waiting for the whole run
+    try:
+        async for chunk in agent.astream(initial_state, stream_mode="updates"):
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                if logger.isEnabledFor(logging.INFO):
+                    fields = ", ".join(
+                        f"{key}={len(value)}"
+                        if isinstance(value, list)
+                        else f"{key}={value}"
+                        for key, value in update.items()
+                    )
+                    logger.info("⚡ %s → %s", node, fields)
+                summary = update.get("summary", summary)
+                error = update.get("error") or error
+    finally:
+        await close_http_client()
 
     if error:
         logger.error("❌ %s", error)
     else:
         logger.info("✅ %s", summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
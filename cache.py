@@ -0,0 +1,83 @@
+"""On-disk cache of LLM review results, keyed by content hash."""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from config import CACHE_DIR, CACHE_TTL, DEFAULT_MODEL, USE_CACHE
+from models import ReviewResult
+from prompts import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(
+    reviewer: str, code: str, filename: str, model: str = DEFAULT_MODEL
+) -> str:
+    """Return a stable SHA-256 key for one reviewer's verdict on *code*.
+
+    ``PROMPT_VERSION`` is part of the key, so bumping it invalidates
+    every cached result. *filename* is too, since it is in the prompt and
+    shapes the review (e.g. which language's checks apply).
+    """
+    payload = json.dumps(
+        {
+            "reviewer": reviewer,
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+            "filename": filename,
+            "code": code,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _path_for(key: str) -> Path:
+    return Path(CACHE_DIR) / f"{key}.json"
+
+
+def get_cached(key: str) -> ReviewResult | None:
+    """Return the cached ReviewResult for *key*, or None on miss / expiry."""
+    if not USE_CACHE:
+        return None
+
+    path = _path_for(key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Ignoring unreadable cache entry %s: %s", path.name, e)
+        return None
+
+    if entry.get("expires", 0) < time.time():
+        path.unlink(missing_ok=True)
+        return None
+
+    try:
+        return ReviewResult.model_validate(entry["result"])
+    except (KeyError, ValidationError) as e:
+        logger.warning("Ignoring invalid cache entry %s: %s", path.name, e)
+        return None
+
+
+def set_cached(key: str, result: ReviewResult, expire: int = CACHE_TTL) -> None:
+    """Store *result* under *key* for *expire* seconds (atomic write)."""
+    if not USE_CACHE:
+        return
+
+    path = _path_for(key)
+    entry = {"expires": time.time() + expire, "result": result.model_dump()}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Failed to write cache entry %s: %s", path.name, e)
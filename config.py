@@ -1,11 +1,17 @@
 """Shared configuration and utilities for PRLens."""
 
+import asyncio
 import functools
+import inspect
+import itertools
 import json
 import logging
 import os
+import random
 import re
 import time
+import weakref
+from collections.abc import Callable
 
 from dotenv import load_dotenv
 from google import genai
@@ -15,7 +21,9 @@ from google.api_core.exceptions import (
     ServiceUnavailable,
     TooManyRequests,
 )
-from pydantic import ValidationError
+from google.genai import errors as genai_errors
+from google.genai import types
+from pydantic import BaseModel, ValidationError
 
 from models import ReviewResult
 
@@ -28,6 +36,7 @@ logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -36,6 +45,29 @@ logger = logging.getLogger(__name__)
 USE_MOCK: bool = os.getenv("USE_MOCK", "false").lower() == "true"
 DEFAULT_MODEL: str = "gemini-2.5-flash-lite"
 
+# Print the final review state as JSON on stdout instead of progress logs
+OUTPUT_JSON: bool = os.getenv("PRLENS_JSON", "false").lower() == "true"
+
+# Upper bound on concurrent reviewer tasks / LLM calls (respects provider limits)
+MAX_CONCURRENCY: int = int(os.getenv("PRLENS_MAX_CONCURRENCY", "8"))
+
+# Client-side LLM rate limits per minute (0 = unlimited); tokens are estimated
+LLM_RPM: int = int(os.getenv("PRLENS_LLM_RPM", "0"))
+LLM_TPM: int = int(os.getenv("PRLENS_LLM_TPM", "0"))
+
+# GitHub REST calls: max in flight, and client-side requests per minute
+# (0 = unlimited); stays clear of GitHub's secondary rate limits
+GITHUB_CONCURRENCY: int = int(os.getenv("PRLENS_GH_CONCURRENCY", "5"))
+GITHUB_RPM: int = int(os.getenv("PRLENS_GH_RPM", "30"))
+
+# Skip files whose added lines are only imports / comments / blank lines
+SKIP_TRIVIAL_FILES: bool = os.getenv("PRLENS_SKIP_TRIVIAL", "true").lower() == "true"
+
+# On-disk cache of review results (never used for mock runs)
+USE_CACHE: bool = not USE_MOCK and os.getenv("PRLENS_CACHE", "true").lower() == "true"
+CACHE_DIR: str = os.getenv("PRLENS_CACHE_DIR", ".prlens_cache")
+CACHE_TTL: int = 7 * 86400  # seconds
+
 # Repo format: "owner/repo"
 _REPO_PATTERN = re.compile(r"^[\w.-]+/[\w.-]+$")
 
@@ -45,8 +77,12 @@ _RETRYABLE_GEMINI_ERRORS: tuple[type[Exception], ...] = (
     TooManyRequests,
     DeadlineExceeded,
     InternalServerError,
+    genai_errors.APIError,
 )
 
+# HTTP status codes from the genai client that are worth retrying
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
 
 # ---------------------------------------------------------------------------
 # Validation helpers
@@ -71,36 +107,136 @@ def with_retry(
     max_retries: int = 3,
     base_delay: float = 1.0,
     retryable: tuple[type[Exception], ...] = (Exception,),
+    max_delay: float = 30.0,
+    should_retry: Callable[[Exception], bool] | None = None,
 ):
-    """Decorator: retry a function with exponential back-off."""
+    """Decorator: retry a function with jittered exponential back-off.
+
+    Each wait is drawn uniformly from ``[0, base_delay * 2**attempt]``
+    (capped at *max_delay*) so concurrent callers that fail together
+    don't retry in lock-step. *should_retry* can veto a *retryable*
+    exception (e.g. a 400 from an API whose 429s are worth retrying).
+
+    Works on both sync and ``async`` functions; coroutines back off with
+    ``asyncio.sleep`` so other in-flight calls keep running.
+    """
+
+    def _give_up(attempt: int, exc: Exception) -> bool:
+        if attempt >= max_retries - 1:
+            return True
+        return should_retry is not None and not should_retry(exc)
 
     def decorator(func):
+        def _backoff(attempt: int, exc: Exception) -> float:
+            delay = random.uniform(0, min(max_delay, base_delay * (2**attempt)))
+            logger.warning(
+                "Attempt %d/%d for %s failed: %s. Retrying in %.1fs…",
+                attempt + 1,
+                max_retries,
+                func.__name__,
+                exc,
+                delay,
+            )
+            return delay
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in itertools.count():
+                    try:
+                        return await func(*args, **kwargs)
+                    except retryable as exc:
+                        if _give_up(attempt, exc):
+                            raise
+                        await asyncio.sleep(_backoff(attempt, exc))
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            last_exc: Exception | None = None
-            for attempt in range(max_retries):
+            for attempt in itertools.count():
                 try:
                     return func(*args, **kwargs)
                 except retryable as exc:
-                    last_exc = exc
-                    if attempt < max_retries - 1:
-                        delay = base_delay * (2**attempt)
-                        logger.warning(
-                            "Attempt %d/%d for %s failed: %s. Retrying in %.1fs…",
-                            attempt + 1,
-                            max_retries,
-                            func.__name__,
-                            exc,
-                            delay,
-                        )
-                        time.sleep(delay)
-            raise last_exc  # type: ignore[misc]
+                    if _give_up(attempt, exc):
+                        raise
+                    time.sleep(_backoff(attempt, exc))
 
         return wrapper
 
     return decorator
 
 
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+class TokenBucket:
+    """Token bucket refilled continuously at *per_minute* tokens a minute.
+
+    ``reserve`` always takes the tokens (the balance may go negative) and
+    returns how long the caller must wait, so concurrent callers queue up
+    in order without a lock.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+def loop_local[T](factory: Callable[[], T]) -> Callable[[], T]:
+    """Return a getter for one ``factory()`` result per running event loop.
+
+    asyncio primitives bind to the first loop that waits on them, so a
+    module-level Semaphore / Lock would break the next ``asyncio.run`` in
+    the same process. Entries go away with their loop.
+    """
+    instances: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get() -> T:
+        loop = asyncio.get_running_loop()
+        instance = instances.get(loop)
+        if instance is None:
+            instance = instances[loop] = factory()
+        return instance
+
+    return get
+
+
+# Shared by every LLM call in the process (one semaphore per event loop)
+_llm_slots = loop_local(lambda: asyncio.Semaphore(MAX_CONCURRENCY))
+_request_bucket = TokenBucket(LLM_RPM) if LLM_RPM > 0 else None
+_token_bucket = TokenBucket(LLM_TPM) if LLM_TPM > 0 else None
+
+
+async def _throttle(estimated_tokens: int) -> None:
+    """Wait until the request and token budgets allow another LLM call."""
+    delay = 0.0
+    if _request_bucket is not None:
+        delay = _request_bucket.reserve(1)
+    if _token_bucket is not None:
+        delay = max(delay, _token_bucket.reserve(estimated_tokens))
+    if delay:
+        logger.debug("Rate limit: waiting %.1fs before LLM call", delay)
+        await asyncio.sleep(delay)
+
+
+def _is_transient_gemini_error(exc: Exception) -> bool:
+    """True unless *exc* is a genai API error with a non-retryable status."""
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in _RETRYABLE_STATUS_CODES
+    return True
+
+
 # ---------------------------------------------------------------------------
 # Cached API clients
 # ---------------------------------------------------------------------------
@@ -116,26 +252,63 @@ def get_gemini_client() -> genai.Client:
 # ---------------------------------------------------------------------------
 # Gemini API call (with retry)
 # ---------------------------------------------------------------------------
-@with_retry(max_retries=3, base_delay=2.0, retryable=_RETRYABLE_GEMINI_ERRORS)
-def call_gemini(prompt: str, model: str = DEFAULT_MODEL) -> str:
-    """Call Gemini and return the raw response text.
+@functools.lru_cache(maxsize=16)
+def _generation_config(system_instruction: str | None) -> types.GenerateContentConfig:
+    """Return the request config for *system_instruction*, built once.
 
-    Retries automatically on transient API errors.
+    There is one per reviewer prompt; reusing it skips re-validating a
+    config dict on every call.
     """
-    client = get_gemini_client()
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config={"response_mime_type": "application/json"},
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        system_instruction=system_instruction or None,
     )
+
+
+@with_retry(
+    max_retries=5,
+    base_delay=2.0,
+    retryable=_RETRYABLE_GEMINI_ERRORS,
+    should_retry=_is_transient_gemini_error,
+)
+async def call_gemini(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    system_instruction: str | None = None,
+) -> str:
+    """Call Gemini (async client) and return the raw response text.
+
+    Static instructions belong in *system_instruction* so they form an
+    identical prefix across calls (eligible for Gemini's prompt caching);
+    *prompt* carries the per-call content.
+
+    Calls are throttled to ``LLM_RPM`` / ``LLM_TPM`` (tokens estimated at
+    ~4 chars each), at most ``MAX_CONCURRENCY`` are in flight, and
+    transient API errors (429 / 5xx) are retried with jittered back-off.
+    """
+    client = get_gemini_client()
+    await _throttle((len(prompt) + len(system_instruction or "")) // 4)
+    async with _llm_slots():
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=_generation_config(system_instruction),
+        )
     return response.text
 
 
 # ---------------------------------------------------------------------------
 # LLM response parsing
 # ---------------------------------------------------------------------------
-def parse_llm_json(text: str) -> ReviewResult | None:
-    """Extract the first JSON object from *text* and validate as ReviewResult."""
+def parse_llm_json[T: BaseModel](text: str, schema: type[T] = ReviewResult) -> T | None:
+    """Extract the first JSON object from *text* and validate it as *schema*."""
+    # Gemini is asked for application/json, so the response is normally one
+    # clean object: parse and validate it in a single pass (pydantic-core)
+    try:
+        return schema.model_validate_json(text)
+    except ValidationError:
+        pass  # wrapped in prose / code fences, or invalid: take the slow path
+
     start = text.find("{")
     if start == -1:
         logger.warning("No JSON object found in LLM response")
@@ -144,7 +317,7 @@ def parse_llm_json(text: str) -> ReviewResult | None:
     try:
         decoder = json.JSONDecoder()
         obj, _ = decoder.raw_decode(text[start:])
-        return ReviewResult.model_validate(obj)
+        return schema.model_validate(obj)
     except json.JSONDecodeError as e:
         logger.warning("JSON decode error: %s", e)
         return None
@@ -1,11 +1,19 @@
-"""Parser for unified diff format using unidiff library."""
+"""Parser for unified diff format.
 
+Git-style diffs are read by a small line scanner; anything it doesn't
+recognise (binary files, rename- or mode-only entries, quoted paths,
+diffs without ``diff --git`` headers) falls back to the unidiff library.
+"""
+
+import functools
+import re
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
 from unidiff import PatchSet
 
 
-@dataclass
+@dataclass(slots=True)
 class FileDiff:
     """Parsed diff for a single file."""
 
@@ -20,19 +28,166 @@ class FileDiff:
         default_factory=list
     )  # (line_num, content)
     patch: str = ""  # raw patch text
+    code: str = ""  # added code formatted for review; set once the file is kept
+
 
+_DEV_NULL = "/dev/null"
+_FILE_HEADER_RE = re.compile(r"^diff --git ", re.MULTILINE)
+_HUNK_HEADER_RE = re.compile(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_PATH_PREFIX_RE = re.compile(r"[abciow12]/")
 
-def parse_diff(diff_text: str) -> list[FileDiff]:
+
+def parse_diff(
+    diff_text: str, path_filter: Callable[[str], bool] | None = None
+) -> list[FileDiff]:
     """
     Parse a unified diff into structured FileDiff objects.
 
     Args:
         diff_text: Raw unified diff string
+        path_filter: If given, only files whose path it accepts are returned;
+            the hunks of rejected files are never scanned
 
     Returns:
         List of FileDiff objects, one per file
     """
+    files = []
+    for section in _split_file_sections(diff_text):
+        scanned = _scan_file_section(section, path_filter)
+        if scanned is None:
+            files.extend(
+                file
+                for file in _parse_with_unidiff(section)
+                if path_filter is None or path_filter(file.filename)
+            )
+        else:
+            files.extend(scanned)
+    return files
+
+
+def _split_file_sections(diff_text: str) -> list[str]:
+    """Split a diff at its ``diff --git`` headers (any preamble is kept)."""
+    starts = [m.start() for m in _FILE_HEADER_RE.finditer(diff_text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    ends = starts[1:] + [len(diff_text)]
+    return [
+        diff_text[start:end]
+        for start, end in zip(starts, ends, strict=True)
+        if diff_text[start:end].strip()
+    ]
+
+
+def _scan_file_section(
+    section: str, path_filter: Callable[[str], bool] | None = None
+) -> list[FileDiff] | None:
+    """
+    Parse one file's section of a git diff without building unidiff objects.
+
+    Produces the same FileDiff as unidiff would, but only walks the lines
+    once and keeps the (line_num, content) pairs it needs.
+
+    Returns:
+        The FileDiff in a list (empty if *path_filter* rejects the file),
+        or None if the section needs the unidiff fallback
+    """
+    lines = section.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    if not lines or not lines[0].startswith("diff --git "):
+        return None
+
+    # Extended header: only the ---/+++ file names matter here
+    source = target = None
+    i, n = 1, len(lines)
+    while i < n and not lines[i].startswith("@@ "):
+        line = lines[i]
+        if line.startswith("--- "):
+            source = line[4:].split("\t", 1)[0]
+        elif line.startswith("+++ "):
+            target = line[4:].split("\t", 1)[0]
+        i += 1
+    if source is None or target is None or source[:1] == '"' or target[:1] == '"':
+        return None
+
+    is_rename = source != _DEV_NULL and target != _DEV_NULL and source[2:] != target[2:]
+    path = target if source == _DEV_NULL or is_rename else source
+    if _PATH_PREFIX_RE.match(path):
+        path = path[2:]
+    if path_filter is not None and not path_filter(path):
+        return []
+
+    added_lines: list[tuple[int, str]] = []
+    deleted_lines: list[tuple[int, str]] = []
+    hunks: list[tuple[int, int, int, int]] = []
+
+    while i < n:
+        match = _HUNK_HEADER_RE.match(lines[i])
+        if match is None:
+            return None
+        source_start = int(match[1])
+        source_length = 1 if match[2] is None else int(match[2])
+        target_start = int(match[3])
+        target_length = 1 if match[4] is None else int(match[4])
+        hunks.append((source_start, source_length, target_start, target_length))
+
+        source_no, target_no = source_start, target_start
+        source_left, target_left = source_length, target_length
+        i += 1
+        while i < n and (source_left > 0 or target_left > 0):
+            line = lines[i]
+            kind = line[:1]
+            if kind == "+":
+                added_lines.append((target_no, line[1:]))
+                target_no += 1
+                target_left -= 1
+            elif kind == "-":
+                deleted_lines.append((source_no, line[1:]))
+                source_no += 1
+                source_left -= 1
+            elif kind == " " or not line:
+                source_no += 1
+                target_no += 1
+                source_left -= 1
+                target_left -= 1
+            elif kind != "\\":  # "\ No newline at end of file"
+                return None
+            i += 1
+        if source_left > 0 or target_left > 0:
+            return None  # truncated hunk
+        while i < n and lines[i].startswith("\\"):
+            i += 1
+
+    # Same precedence as unidiff's is_added_file / is_removed_file / is_rename
+    only_hunk = hunks[0] if len(hunks) == 1 else None
+    if source == _DEV_NULL or (only_hunk and only_hunk[:2] == (0, 0)):
+        status = "added"
+    elif target == _DEV_NULL or (only_hunk and only_hunk[2:] == (0, 0)):
+        status = "deleted"
+    elif is_rename:
+        status = "renamed"
+    else:
+        status = "modified"
+
+    return [
+        FileDiff(
+            filename=path,
+            status=status,
+            additions=len(added_lines),
+            deletions=len(deleted_lines),
+            added_lines=added_lines,
+            deleted_lines=deleted_lines,
+            patch=section,
+        )
+    ]
+
+
+def _parse_with_unidiff(diff_text: str) -> list[FileDiff]:
+    """Parse *diff_text* with unidiff (handles every diff variant)."""
     patch_set = PatchSet(diff_text)
+    # parse_diff hands over one file's section at a time, which is already
+    # that file's patch text; only multi-file input needs str() to rebuild it
+    single_file = len(patch_set) == 1
     files = []
 
     for patched_file in patch_set:
@@ -47,15 +202,17 @@ def parse_diff(diff_text: str) -> list[FileDiff]:
             status = "modified"
 
         # Extract added and deleted lines with line numbers
-        added_lines = []
-        deleted_lines = []
-
-        for hunk in patched_file:
-            for line in hunk:
-                if line.is_added:
-                    added_lines.append((line.target_line_no, line.value.rstrip("\n")))
-                elif line.is_removed:
-                    deleted_lines.append((line.source_line_no, line.value.rstrip("\n")))
+        lines = [line for hunk in patched_file for line in hunk]
+        added_lines = [
+            (line.target_line_no, _strip_newline(line.value))
+            for line in lines
+            if line.is_added
+        ]
+        deleted_lines = [
+            (line.source_line_no, _strip_newline(line.value))
+            for line in lines
+            if line.is_removed
+        ]
 
         files.append(
             FileDiff(
@@ -65,13 +222,68 @@ def parse_diff(diff_text: str) -> list[FileDiff]:
                 deletions=patched_file.removed,
                 added_lines=added_lines,
                 deleted_lines=deleted_lines,
-                patch=str(patched_file),
+                patch=diff_text if single_file else str(patched_file),
             )
         )
 
     return files
 
 
+def _strip_newline(value: str) -> str:
+    # Only the line terminator; trailing spaces / \r are part of the content
+    return value[:-1] if value.endswith("\n") else value
+
+
+class DiffStreamParser:
+    """
+    Incrementally parse a unified diff as it arrives.
+
+    Text is fed in arbitrary chunks. A file is complete once the next
+    ``diff --git`` header shows up, so only one file's lines are buffered
+    and parsed at a time instead of the whole PR.
+
+    Args:
+        path_filter: Passed on to ``parse_diff``
+    """
+
+    def __init__(self, path_filter: Callable[[str], bool] | None = None) -> None:
+        self._path_filter = path_filter
+        self._partial = ""  # trailing text without a newline yet
+        self._lines: list[str] = []  # lines of the file being read
+
+    def feed(self, text: str) -> list[FileDiff]:
+        """
+        Add a chunk of diff text.
+
+        Args:
+            text: Next chunk of the raw diff (may split lines anywhere)
+
+        Returns:
+            FileDiff objects for files completed by this chunk
+        """
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+
+        completed = []
+        for line in lines:
+            if line.startswith("diff --git ") and self._lines:
+                completed.extend(self._flush())
+            self._lines.append(line + "\n")
+        return completed
+
+    def close(self) -> list[FileDiff]:
+        """Parse whatever is still buffered once the input has ended."""
+        if self._partial:
+            self._lines.append(self._partial)
+            self._partial = ""
+        return self._flush()
+
+    def _flush(self) -> list[FileDiff]:
+        text = "".join(self._lines)
+        self._lines = []
+        return parse_diff(text, self._path_filter) if text.strip() else []
+
+
 # File extensions to skip during review
 SKIP_EXTENSIONS = {
     ".md",
@@ -139,38 +351,64 @@ SKIP_DIRECTORIES = {
 }
 
 
+# Added lines that give an LLM nothing to review: blanks, comments and plain
+# import statements (a parenthesised / multi-line import is not matched).
+# A "#" comment needs whitespace or nothing after it, so C preprocessor lines
+# (#define, #pragma) and Rust attributes (#[...], #![...]) are real code.
+_TRIVIAL_LINE_RE = re.compile(
+    r"\s*(?:#(?:\s.*)?|//.*|(?:from\s+\S+\s+)?import\s+[^(;]+;?)?"
+)
+
+
+def _alternation(items: set[str]) -> str:
+    # Longest first so e.g. ".min.js" isn't shadowed by a shorter alternative
+    return "|".join(map(re.escape, sorted(items, key=len, reverse=True)))
+
+
+# All skip rules in one pattern, so each filename is a single C-level scan:
+# a skipped directory anywhere in the path, an exact basename, or an
+# extension (the only case-insensitive rule)
+_SKIP_RE = re.compile(
+    rf"(?:^|/)(?:{_alternation(SKIP_DIRECTORIES)})"
+    rf"|(?:^|/)(?:{_alternation(SKIP_FILENAMES)})\Z"
+    rf"|(?i:{_alternation(SKIP_EXTENSIONS)})\Z"
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def should_review_file(filename: str) -> bool:
-    """Check if file should be reviewed based on name/extension."""
-    # Check directory
-    for skip_dir in SKIP_DIRECTORIES:
-        if filename.startswith(skip_dir) or f"/{skip_dir}" in filename:
-            return False
+    """Check if file should be reviewed based on name/extension.
+
+    Memoized: the same paths recur across PRs in a long-running process.
+    """
+    return _SKIP_RE.search(filename) is None
 
-    # Check exact filename
-    basename = filename.split("/")[-1]
-    if basename in SKIP_FILENAMES:
-        return False
 
-    # Check extension
-    return all(not filename.lower().endswith(ext) for ext in SKIP_EXTENSIONS)
+def is_trivial_change(file: FileDiff) -> bool:
+    """Check if every added line is blank, a comment or an import."""
+    return all(_TRIVIAL_LINE_RE.fullmatch(content) for _, content in file.added_lines)
 
 
 def filter_files(
-    files: list[FileDiff], include_deletions: bool = False
+    files: list[FileDiff],
+    include_deletions: bool = False,
+    include_trivial: bool = False,
 ) -> list[FileDiff]:
-    """Filter out files that shouldn't be reviewed."""
-    result = []
+    """Filter out files that shouldn't be reviewed.
 
-    for file in files:
-        if not should_review_file(file.filename):
-            continue
-        if not include_deletions and file.status == "deleted":
-            continue
-        if not include_deletions and len(file.added_lines) == 0:
-            continue
-        result.append(file)
-
-    return result
+    Files whose added lines are only imports / comments are dropped too
+    (see ``is_trivial_change``) unless *include_trivial* is set.
+    """
+    # Cheapest checks first: status / emptiness, then the name regex, then
+    # the per-line trivial scan (only for files that add lines, so kept
+    # deletions aren't mistaken for trivial changes)
+    return [
+        file
+        for file in files
+        if (include_deletions or (file.status != "deleted" and file.added_lines))
+        and should_review_file(file.filename)
+        and (include_trivial or not file.added_lines or not is_trivial_change(file))
+    ]
 
 
 def extract_added_code(file: FileDiff, include_line_numbers: bool = True) -> str:
@@ -184,17 +422,11 @@ def extract_added_code(file: FileDiff, include_line_numbers: bool = True) -> str
     Returns:
         String containing only the new code, ready for review
     """
-    if not file.added_lines:
-        return ""
-
-    lines = []
-    for line_num, content in file.added_lines:
-        if include_line_numbers:
-            lines.append(f"{line_num:4}| {content}")
-        else:
-            lines.append(content)
-
-    return "\n".join(lines)
+    if include_line_numbers:
+        return "\n".join(
+            f"{line_num:4}| {content}" for line_num, content in file.added_lines
+        )
+    return "\n".join(content for _, content in file.added_lines)
 
 
 def get_review_content(file: FileDiff) -> dict:
@@ -1,16 +1,27 @@
 """GitHub API client for PR operations."""
 
+import asyncio
 import functools
+import itertools
 import logging
 import os
+import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 
-import requests
-import requests.exceptions
+import httpx
 from github import Auth, Github
 from github.GithubException import GithubException
-
-from config import validate_repo, with_retry
+from github.Repository import Repository
+
+from config import (
+    GITHUB_CONCURRENCY,
+    GITHUB_RPM,
+    TokenBucket,
+    loop_local,
+    validate_repo,
+    with_retry,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +29,7 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
-@dataclass
+@dataclass(slots=True)
 class PRMetadata:
     """Pull Request metadata."""
 
@@ -30,9 +41,10 @@ class PRMetadata:
     base_branch: str
     head_branch: str
     description: str | None
+    head_sha: str  # commit a review is anchored to
 
 
-@dataclass
+@dataclass(slots=True)
 class ReviewComment:
     """A comment to post on a specific line in a PR."""
 
@@ -42,7 +54,7 @@ class ReviewComment:
     side: str = "RIGHT"  # RIGHT = new code, LEFT = old code
 
 
-@dataclass
+@dataclass(slots=True)
 class ReviewSubmission:
     """A complete review to submit to a PR."""
 
@@ -66,6 +78,160 @@ def get_github_client() -> Github:
     return Github(auth=Auth.Token(token))
 
 
+@functools.lru_cache(maxsize=32)
+def get_repository(repo: str) -> Repository:
+    """
+    Return a cached, lazily loaded Repository for *repo*.
+
+    ``lazy=True`` skips the GET /repos/{repo} round trip: the object only
+    carries the name, which is all the pull-request calls need.
+    """
+    return get_github_client().get_repo(repo, lazy=True)
+
+
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared async HTTP client for direct REST calls.
+
+    Reusing one client keeps connections to api.github.com alive, so only
+    the first request pays for the TCP/TLS handshake. A new client is made
+    if the event loop changed, since pooled connections belong to a loop;
+    call ``close_http_client`` before each loop ends so the old pool is
+    released.
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        if _http_client is not None and not _http_client.is_closed:
+            _discard_http_client(_http_client, _http_client_loop)
+        _http_client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+def _discard_http_client(
+    client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None
+) -> None:
+    """Release a client left open by another event loop."""
+    if loop is not None and loop.is_running():
+        # Its connections belong to that loop, so close it there
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        logger.warning(
+            "Dropping an HTTP client from a finished event loop without closing "
+            "it; call close_http_client() before the loop ends"
+        )
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call before the event loop shuts down)."""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+# Shared by every REST call in the process (one semaphore per event loop)
+_github_slots = loop_local(lambda: asyncio.Semaphore(GITHUB_CONCURRENCY))
+_github_bucket = TokenBucket(GITHUB_RPM) if GITHUB_RPM > 0 else None
+
+# A secondary rate limit answers 403/429 with Retry-After; longer waits
+# (e.g. an exhausted hourly quota) are returned to the caller as errors
+_RATE_LIMIT_STATUS_CODES = frozenset({403, 429})
+_RATE_LIMIT_RETRIES = 3
+_MAX_RETRY_AFTER = 60.0
+
+# GitHub asks for content-creating requests (POST/PATCH/PUT/DELETE) to be
+# made one at a time, at least a second apart
+_READ_METHODS = frozenset({"GET", "HEAD"})
+_WRITE_INTERVAL = 1.0
+_write_lock = loop_local(asyncio.Lock)
+_last_write = 0.0
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds GitHub asks us to wait before retrying, if it asked at all."""
+    if response.status_code not in _RATE_LIMIT_STATUS_CODES:
+        return None
+    try:
+        delay = float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+    return delay if delay <= _MAX_RETRY_AFTER else None
+
+
+async def _request(
+    method: str, url: str, *, stream: bool = False, **kwargs
+) -> httpx.Response:
+    """
+    Send a request on the shared client within GitHub's rate limits.
+
+    At most ``GITHUB_CONCURRENCY`` requests are in flight, starts are paced
+    to ``GITHUB_RPM`` if set, and a rate-limited response carrying a short
+    Retry-After is waited out and re-sent. Writes are also serialised and
+    spaced ``_WRITE_INTERVAL`` apart.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        stream: If True, the body is not read (caller must close it)
+        **kwargs: Passed to ``httpx.AsyncClient.build_request``
+
+    Returns:
+        The last response received
+    """
+    global _last_write
+
+    client = get_http_client()
+    request = client.build_request(method, url, **kwargs)
+    if method in _READ_METHODS:
+        return await _send(client, request, stream)
+
+    async with _write_lock():
+        wait = _last_write + _WRITE_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            return await _send(client, request, stream)
+        finally:
+            _last_write = time.monotonic()
+
+
+async def _send(
+    client: httpx.AsyncClient, request: httpx.Request, stream: bool
+) -> httpx.Response:
+    for attempt in itertools.count(1):
+        if _github_bucket is not None and (delay := _github_bucket.reserve(1)):
+            logger.debug("Rate limit: waiting %.1fs before GitHub call", delay)
+            await asyncio.sleep(delay)
+        async with _github_slots():
+            response = await client.send(request, stream=stream)
+
+        delay = _retry_after(response)
+        if delay is None or attempt >= _RATE_LIMIT_RETRIES:
+            return response
+        await response.aclose()
+        logger.warning(
+            "GitHub rate limit on %s %s; retrying in %.1fs",
+            request.method,
+            request.url,
+            delay,
+        )
+        await asyncio.sleep(delay)
+
+
 # ---------------------------------------------------------------------------
 # Read operations
 # ---------------------------------------------------------------------------
@@ -84,11 +250,9 @@ def fetch_pr_metadata(repo: str, pr_number: int) -> PRMetadata:
         ValueError: If PR not found or access denied
     """
     repo = validate_repo(repo)
-    client = get_github_client()
 
     try:
-        repository = client.get_repo(repo)
-        pr = repository.get_pull(pr_number)
+        pr = get_repository(repo).get_pull(pr_number)
 
         return PRMetadata(
             number=pr.number,
@@ -99,6 +263,7 @@ def fetch_pr_metadata(repo: str, pr_number: int) -> PRMetadata:
             base_branch=pr.base.ref,
             head_branch=pr.head.ref,
             description=pr.body,
+            head_sha=pr.head.sha,
         )
     except GithubException as e:
         if e.status == 404:
@@ -106,66 +271,90 @@ def fetch_pr_metadata(repo: str, pr_number: int) -> PRMetadata:
         raise ValueError(f"GitHub API error: {e.data.get('message', str(e))}") from e
 
 
-@with_retry(
-    max_retries=3,
-    base_delay=1.0,
-    retryable=(
-        requests.exceptions.ConnectionError,
-        requests.exceptions.Timeout,
-    ),
-)
-def fetch_raw_diff(repo: str, pr_number: int) -> str:
+_RETRYABLE_HTTP_ERRORS = (httpx.ConnectError, httpx.TimeoutException)
+
+
+def _api_headers(accept: str = "application/vnd.github+json") -> dict[str, str]:
+    """Return auth headers for a direct REST call."""
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise ValueError("GITHUB_TOKEN not found")
+    return {"Authorization": f"token {token}", "Accept": accept}
+
+
+def _pull_url(repo: str, pr_number: int) -> str:
+    return f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
+
+
+def _diff_request(repo: str, pr_number: int) -> tuple[str, dict[str, str]]:
+    """Return the URL and headers for the raw-diff endpoint of a PR."""
+    return _pull_url(repo, pr_number), _api_headers("application/vnd.github.v3.diff")
+
+
+def _check_diff_response(response: httpx.Response, repo: str, pr_number: int) -> None:
+    if response.status_code == 404:
+        raise ValueError(f"PR #{pr_number} not found in {repo}")
+    response.raise_for_status()
+
+
+@with_retry(max_retries=3, base_delay=1.0, retryable=_RETRYABLE_HTTP_ERRORS)
+async def _open_diff_stream(url: str, headers: dict[str, str]) -> httpx.Response:
+    return await _request("GET", url, headers=headers, stream=True)
+
+
+async def stream_raw_diff(repo: str, pr_number: int) -> AsyncIterator[str]:
     """
-    Fetch the raw unified diff for the entire PR.
+    Stream the raw unified diff for the PR as text chunks.
 
-    This uses the REST API directly because PyGithub doesn't expose
-    the raw diff format. The diff includes all files in one string.
+    This uses the REST API directly because PyGithub doesn't expose the
+    raw diff format. Lets the caller parse files while the rest of the
+    diff is still downloading. Opening the connection is retried on
+    connection errors and timeouts; an error part-way through the body is
+    raised to the caller.
 
     Args:
         repo: Repository in "owner/repo" format
         pr_number: Pull request number
 
-    Returns:
-        Raw unified diff as a string
+    Yields:
+        Decoded chunks of the raw diff, in order
 
     Raises:
         ValueError: If PR not found or access denied
     """
     repo = validate_repo(repo)
+    url, headers = _diff_request(repo, pr_number)
 
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("GITHUB_TOKEN not found")
-
-    url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3.diff",
-    }
-
-    response = requests.get(url, headers=headers, timeout=30)
-
-    if response.status_code == 404:
-        raise ValueError(f"PR #{pr_number} not found in {repo}")
-    response.raise_for_status()
-
-    return response.text
+    response = await _open_diff_stream(url, headers)
+    try:
+        _check_diff_response(response, repo, pr_number)
+        async for chunk in response.aiter_text():
+            yield chunk
+    finally:
+        await response.aclose()
 
 
 # ---------------------------------------------------------------------------
 # Write operations
 # ---------------------------------------------------------------------------
-def post_review(repo: str, pr_number: int, review: ReviewSubmission) -> int:
+async def post_review(
+    repo: str,
+    pr_number: int,
+    review: ReviewSubmission,
+    commit_id: str | None = None,
+) -> int:
     """
     Post a complete review with inline comments to a PR.
 
     This is the main function for posting AI findings. Each comment
-    appears inline next to the relevant code.
+    appears inline next to the relevant code. Uses the REST API through
+    httpx so posting doesn't block the event loop.
 
     Args:
         repo: Repository in "owner/repo" format
         pr_number: Pull request number
         review: ReviewSubmission with body, event type, and comments
+        commit_id: Head SHA to anchor the review to; looked up if not given
 
     Returns:
         Review ID
@@ -174,49 +363,55 @@ def post_review(repo: str, pr_number: int, review: ReviewSubmission) -> int:
         ValueError: If posting fails
     """
     repo = validate_repo(repo)
-    client = get_github_client()
-
-    try:
-        repository = client.get_repo(repo)
-        pr = repository.get_pull(pr_number)
-
-        # Get the latest commit SHA (required for review API)
-        commit = pr.get_commits().reversed[0]
-
-        # Build comments in the format GitHub expects
-        comments_payload = []
-        for comment in review.comments:
-            comments_payload.append(
-                {
-                    "path": comment.path,
-                    "line": comment.line,
-                    "side": comment.side,
-                    "body": comment.body,
-                }
-            )
-
-        # Use PyGithub's create_review method
-        github_review = pr.create_review(
-            commit=commit,
-            body=review.body,
-            event=review.event,
-            comments=comments_payload,
-        )
-
-        logger.info(
-            "Posted review %d on PR #%d with %d comments",
-            github_review.id,
-            pr_number,
-            len(comments_payload),
-        )
-        return github_review.id
-
-    except GithubException as e:
-        error_msg = e.data.get("message", str(e)) if hasattr(e, "data") else str(e)
+    url = _pull_url(repo, pr_number)
+    headers = _api_headers()
+
+    # Build comments in the format GitHub expects
+    comments_payload = [
+        {
+            "path": comment.path,
+            "line": comment.line,
+            "side": comment.side,
+            "body": comment.body,
+        }
+        for comment in review.comments
+    ]
+
+    # Get the head commit SHA the review is anchored to
+    if commit_id is None:
+        pr_response = await _request("GET", url, headers=headers)
+        if pr_response.status_code == 404:
+            raise ValueError(f"PR #{pr_number} not found in {repo}")
+        pr_response.raise_for_status()
+        commit_id = pr_response.json()["head"]["sha"]
+
+    response = await _request(
+        "POST",
+        f"{url}/reviews",
+        headers=headers,
+        json={
+            "commit_id": commit_id,
+            "body": review.body,
+            "event": review.event,
+            "comments": comments_payload,
+        },
+    )
+
+    if response.is_error:
+        data = response.json() if response.content else {}
+        error_msg = data.get("message", response.reason_phrase)
         logger.error("Failed to post review: %s", error_msg)
 
-        if hasattr(e, "data") and "errors" in e.data:
-            for error in e.data["errors"]:
-                logger.error("  - %s", error)
+        for error in data.get("errors", []):
+            logger.error("  - %s", error)
+
+        raise ValueError(f"Failed to post review: {error_msg}")
 
-        raise ValueError(f"Failed to post review: {error_msg}") from e
+    review_id = response.json()["id"]
+    logger.info(
+        "Posted review %d on PR #%d with %d comments",
+        review_id,
+        pr_number,
+        len(comments_payload),
+    )
+    return review_id
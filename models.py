@@ -31,3 +31,22 @@ class ReviewResult(BaseModel):
 
     findings: list[Finding] = Field(default_factory=list)
     summary: str = Field(default="", description="Brief overall summary")
+    complete: bool = Field(
+        default=True,
+        exclude=True,
+        description="False if part of the code could not be reviewed",
+    )
+
+
+class FileReview(BaseModel):
+    """Findings for one file within a batched review."""
+
+    filename: str = Field(description="Path of the reviewed file")
+    findings: list[Finding] = Field(default_factory=list)
+
+
+class BatchReviewResult(BaseModel):
+    """Output from a single reviewer covering several files at once."""
+
+    # Required: a single-file style reply must not validate as an empty batch
+    per_file: list[FileReview] = Field(description="Findings for each file")
@@ -1,4 +1,13 @@
-"""Prompt templates for code analysis."""
+"""Prompt templates for code analysis.
+
+Each reviewer prompt is a static *system instruction*; the code under review
+is sent separately as the user message (``CODE_MESSAGE``). Keeping the
+instructions byte-identical across calls lets Gemini reuse the cached prefix
+for every file in a run.
+"""
+
+# Bump whenever a prompt changes so cached review results are invalidated
+PROMPT_VERSION = "2"
 
 # =============================================================================
 # SHARED PREAMBLE — injected into every reviewer prompt
@@ -39,7 +48,32 @@ _OUTPUT_RULES = (
 )
 
 _EMPTY_RESULT = (
-    'If no issues found, return: {{"findings":[],"summary":"No issues found"}}\n'
+    'If no issues found, return: {"findings":[],"summary":"No issues found"}\n'
+)
+
+
+# =============================================================================
+# USER MESSAGE — the only per-file part of a request
+# =============================================================================
+
+CODE_MESSAGE = (
+    "Review this code from file '{filename}'{chunk_note}.\n\n```\n{code}\n```"
+)
+
+# Several small files reviewed in one request; {sections} is a run of
+# BATCH_FILE_SECTION blocks. Overrides the single-file output format.
+BATCH_FILE_SECTION = "--- FILE: {filename} ---\n```\n{code}\n```\n"
+
+BATCH_MESSAGE = (
+    "Review each of the following {count} files independently. "
+    "Line numbers refer to the file they appear in.\n"
+    "\n"
+    "{sections}"
+    "\n"
+    "Instead of the single-file format, respond with ONLY valid JSON:\n"
+    '{{"per_file":[{{"filename":"path/of/file","findings":[...]}}]}}\n'
+    "Each findings list uses the required finding format. "
+    "Include every file, with an empty findings list if it has no issues.\n"
 )
 
 
@@ -62,23 +96,19 @@ REVIEW_PROMPT = (
     "- Missing docstrings on obvious one-line functions\n"
     "- Standard boilerplate or framework patterns\n"
     "- Issues already covered by a linter (imports, whitespace)\n"
-    "\n"
-    "```\n"
-    "{code}\n"
-    "```\n"
     "\n" + _OUTPUT_RULES + _EMPTY_RESULT + "\n"
     "Required format:\n"
-    '{{"findings":[{{"severity":"CRITICAL|HIGH|MEDIUM|LOW",'
+    '{"findings":[{"severity":"CRITICAL|HIGH|MEDIUM|LOW",'
     '"category":"bug|performance|style",'
-    '"line":1,"description":"issue","fix":"solution"}}],'
-    '"summary":"one line"}}\n'
+    '"line":1,"description":"issue","fix":"solution"}],'
+    '"summary":"one line"}\n'
     "\n"
     "Example:\n"
-    '{{"findings":[{{"severity":"HIGH","category":"bug","line":3,'
+    '{"findings":[{"severity":"HIGH","category":"bug","line":3,'
     '"description":"ZeroDivisionError when list is empty — '
     'len(numbers) is 0",'
-    '"fix":"if not numbers: return 0"}}],'
-    '"summary":"1 bug found"}}'
+    '"fix":"if not numbers: return 0"}],'
+    '"summary":"1 bug found"}'
 )
 
 
@@ -115,23 +145,19 @@ SECURITY_PROMPT = (
     "- API keys read from environment variables (that is correct practice)\n"
     "- HTTPS URLs or public constants\n"
     "- Test fixtures or mock data\n"
-    "\n"
-    "```\n"
-    "{code}\n"
-    "```\n"
     "\n" + _OUTPUT_RULES + _EMPTY_RESULT + "\n"
     "Required format:\n"
-    '{{"findings":[{{"severity":"CRITICAL|HIGH|MEDIUM|LOW",'
+    '{"findings":[{"severity":"CRITICAL|HIGH|MEDIUM|LOW",'
     '"category":"security","line":1,'
-    '"description":"security issue","fix":"secure solution"}}],'
-    '"summary":"one line"}}\n'
+    '"description":"security issue","fix":"secure solution"}],'
+    '"summary":"one line"}\n'
     "\n"
     "Example:\n"
-    '{{"findings":[{{"severity":"CRITICAL","category":"security","line":5,'
+    '{"findings":[{"severity":"CRITICAL","category":"security","line":5,'
     '"description":"SQL Injection — user input concatenated into query",'
     '"fix":"Use parameterized query: '
     'cursor.execute(\\"SELECT * FROM users WHERE id = %s\\", (user_id,))"'
-    '}}],"summary":"1 critical security issue"}}'
+    '}],"summary":"1 critical security issue"}'
 )
 
 
@@ -167,21 +193,17 @@ QUALITY_PROMPT = (
     "- Missing docstrings on private helper functions\n"
     "- Stylistic preferences already handled by formatters (black, ruff)\n"
     "- Single-use variables that improve readability\n"
-    "\n"
-    "```\n"
-    "{code}\n"
-    "```\n"
     "\n" + _OUTPUT_RULES + _EMPTY_RESULT + "\n"
     "Required format:\n"
-    '{{"findings":[{{"severity":"MEDIUM|LOW","category":"quality",'
+    '{"findings":[{"severity":"MEDIUM|LOW","category":"quality",'
     '"line":1,"description":"quality issue",'
-    '"fix":"improvement suggestion"}}],'
-    '"summary":"one line"}}\n'
+    '"fix":"improvement suggestion"}],'
+    '"summary":"one line"}\n'
     "\n"
     "Example:\n"
-    '{{"findings":[{{"severity":"MEDIUM","category":"quality","line":10,'
+    '{"findings":[{"severity":"MEDIUM","category":"quality","line":10,'
     '"description":"Function process_data is 45 lines with 3 levels of nesting",'
     '"fix":"Extract validation into _validate_input() '
-    'and transformation into _transform()"}}],'
-    '"summary":"1 quality issue found"}}'
+    'and transformation into _transform()"}],'
+    '"summary":"1 quality issue found"}'
 )
@@ -1,5 +1,6 @@
 """PR Review orchestration - connects GitHub + Gemini."""
 
+import asyncio
 import logging
 
 from config import (
@@ -8,8 +9,15 @@ from config import (
     call_gemini,
     parse_llm_json,
 )
-from models import Finding, ReviewResult
-from prompts import QUALITY_PROMPT, REVIEW_PROMPT, SECURITY_PROMPT
+from models import BatchReviewResult, Finding, ReviewResult
+from prompts import (
+    BATCH_FILE_SECTION,
+    BATCH_MESSAGE,
+    CODE_MESSAGE,
+    QUALITY_PROMPT,
+    REVIEW_PROMPT,
+    SECURITY_PROMPT,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,10 @@ logger = logging.getLogger(__name__)
 MAX_LINES_PER_CHUNK = 200  # Max lines to send in one request
 MAX_CHARS_PER_CHUNK = 15000  # Max characters (~3750 tokens)
 
+# Small files are packed together so they share one request per reviewer
+MAX_CHARS_PER_BATCH = MAX_CHARS_PER_CHUNK  # Combined code size of one batch
+MAX_FILES_PER_BATCH = 8  # Keeps the per-file JSON response manageable
+
 
 # ---------------------------------------------------------------------------
 # Chunking helpers
@@ -83,7 +95,23 @@ def is_large_file(code: str) -> bool:
 # ---------------------------------------------------------------------------
 # Core review functions
 # ---------------------------------------------------------------------------
-def analyze_code_chunk(
+def _mock_review() -> ReviewResult:
+    """Return the general reviewer's mock result (a fresh copy per file)."""
+    return ReviewResult(
+        findings=[
+            Finding(
+                severity="MEDIUM",
+                category="bug",
+                line=1,
+                description="Mock finding for testing",
+                fix="This is a mock fix",
+            )
+        ],
+        summary="Mock review",
+    )
+
+
+async def analyze_code_chunk(
     code: str,
     filename: str,
     chunk_info: str = "",
@@ -91,34 +119,20 @@ def analyze_code_chunk(
 ) -> ReviewResult | None:
     """Send a single code chunk to Gemini for review."""
     if USE_MOCK:
-        return ReviewResult(
-            findings=[
-                Finding(
-                    severity="MEDIUM",
-                    category="bug",
-                    line=1,
-                    description="Mock finding for testing",
-                    fix="This is a mock fix",
-                )
-            ],
-            summary="Mock review",
-        )
+        return _mock_review()
 
     chunk_note = f" ({chunk_info})" if chunk_info else ""
-    prompt = (
-        f"Review this code from file '{filename}'{chunk_note}.\n\n"
-        f"{REVIEW_PROMPT.format(code=code)}"
-    )
+    prompt = CODE_MESSAGE.format(filename=filename, chunk_note=chunk_note, code=code)
 
     try:
-        text = call_gemini(prompt, model)
+        text = await call_gemini(prompt, model, system_instruction=REVIEW_PROMPT)
         return parse_llm_json(text)
     except Exception as e:
         logger.error("Error reviewing %s: %s", filename, e)
         return None
 
 
-def analyze_code(
+async def analyze_code(
     code: str,
     filename: str,
     model: str = DEFAULT_MODEL,
@@ -126,32 +140,50 @@ def analyze_code(
     """
     Send code to Gemini for review, handling large files with chunking.
 
-    If code exceeds limits, splits into chunks and combines findings.
+    If code exceeds limits, splits into chunks, reviews them concurrently
+    and combines findings in chunk order.
+
+    Returns:
+        ReviewResult (empty if no chunk found anything), or None if every
+        chunk failed. If only some chunks failed, the findings of the rest
+        are returned with ``complete=False`` so they aren't cached.
     """
     # Check if chunking is needed
     if not is_large_file(code):
-        return analyze_code_chunk(code, filename, model=model)
+        return await analyze_code_chunk(code, filename, model=model)
 
     # Split into chunks and review each
     chunks = chunk_code(code)
     logger.info("  Large file detected - splitting into %d chunks", len(chunks))
 
-    all_findings: list[Finding] = []
-    summaries: list[str] = []
-
-    for i, chunk in enumerate(chunks, 1):
-        chunk_info = f"chunk {i}/{len(chunks)}"
-        logger.info("  Reviewing %s...", chunk_info)
+    # Chunks are independent, so review them concurrently (call_gemini
+    # bounds how many requests are actually in flight)
+    results = await asyncio.gather(
+        *(
+            analyze_code_chunk(
+                chunk, filename, chunk_info=f"chunk {i}/{len(chunks)}", model=model
+            )
+            for i, chunk in enumerate(chunks, 1)
+        )
+    )
 
-        result = analyze_code_chunk(chunk, filename, chunk_info=chunk_info, model=model)
+    failed = sum(result is None for result in results)
+    if failed == len(chunks):
+        return None
+    if failed:
+        logger.warning(
+            "  %d of %d chunks of %s failed to review", failed, len(chunks), filename
+        )
 
-        if result:
-            all_findings.extend(result.findings)
-            if result.summary:
-                summaries.append(result.summary)
+    all_findings: list[Finding] = []
+    summaries: list[str] = []
 
-    if not all_findings:
-        return None
+    for result in results:
+        if result is None:
+            continue
+        all_findings.extend(result.findings)
+        if result.summary:
+            summaries.append(result.summary)
 
     # Combine results
     return ReviewResult(
@@ -159,16 +191,17 @@ def analyze_code(
         summary=(
             f"Combined review of {len(chunks)} chunks: " + "; ".join(summaries[:3])
         ),
+        complete=not failed,
     )
 
 
 # ---------------------------------------------------------------------------
 # Specialised reviewers
 # ---------------------------------------------------------------------------
-def _review_with_prompt(
+async def _review_with_prompt(
     code: str,
     filename: str,
-    prompt_template: str,
+    system_prompt: str,
     reviewer_name: str,
     model: str = DEFAULT_MODEL,
 ) -> ReviewResult | None:
@@ -178,7 +211,7 @@ def _review_with_prompt(
     Args:
         code: The code to review
         filename: Name of the file being reviewed
-        prompt_template: The prompt template to use (must have {code} placeholder)
+        system_prompt: Reviewer instructions, sent as the system instruction
         reviewer_name: Name for logging (e.g., "security", "quality")
         model: Gemini model to use
 
@@ -191,17 +224,17 @@ def _review_with_prompt(
             summary=f"Mock {reviewer_name} review - no issues",
         )
 
-    prompt = prompt_template.format(code=code)
+    prompt = CODE_MESSAGE.format(filename=filename, chunk_note="", code=code)
 
     try:
-        text = call_gemini(prompt, model)
+        text = await call_gemini(prompt, model, system_instruction=system_prompt)
         return parse_llm_json(text)
     except Exception as e:
         logger.error("%s error reviewing %s: %s", reviewer_name, filename, e)
         return None
 
 
-def security_review(
+async def security_review(
     code: str,
     filename: str,
     model: str = DEFAULT_MODEL,
@@ -226,10 +259,10 @@ def security_review(
         ReviewResult with security findings only
     """
     logger.info("  🔒 Security review: %s", filename)
-    return _review_with_prompt(code, filename, SECURITY_PROMPT, "security", model)
+    return await _review_with_prompt(code, filename, SECURITY_PROMPT, "security", model)
 
 
-def quality_review(
+async def quality_review(
     code: str,
     filename: str,
     model: str = DEFAULT_MODEL,
@@ -253,4 +286,86 @@ def quality_review(
         ReviewResult with quality findings only
     """
     logger.info("  📐 Quality review: %s", filename)
-    return _review_with_prompt(code, filename, QUALITY_PROMPT, "quality", model)
+    return await _review_with_prompt(code, filename, QUALITY_PROMPT, "quality", model)
+
+
+# ---------------------------------------------------------------------------
+# Batched reviewers (several small files per request)
+# ---------------------------------------------------------------------------
+async def _review_batch_with_prompt(
+    files: list[tuple[str, str]],
+    system_prompt: str,
+    reviewer_name: str,
+    model: str = DEFAULT_MODEL,
+) -> dict[str, ReviewResult] | None:
+    """
+    Review several small files in a single request.
+
+    Args:
+        files: (code, filename) pairs; together they should fit one batch
+        system_prompt: Reviewer instructions, sent as the system instruction
+        reviewer_name: Name for logging (e.g., "security", "quality")
+        model: Gemini model to use
+
+    Returns:
+        ReviewResult per filename present in the response, or None if failed
+    """
+    if USE_MOCK:
+        # Same results as the single-file mocks, so batching doesn't change
+        # what a mock run reports
+        return {
+            filename: (
+                _mock_review()
+                if reviewer_name == "general"
+                else ReviewResult(summary=f"Mock {reviewer_name} review - no issues")
+            )
+            for _, filename in files
+        }
+
+    sections = "".join(
+        BATCH_FILE_SECTION.format(filename=filename, code=code)
+        for code, filename in files
+    )
+    prompt = BATCH_MESSAGE.format(count=len(files), sections=sections)
+
+    try:
+        text = await call_gemini(prompt, model, system_instruction=system_prompt)
+        batch = parse_llm_json(text, BatchReviewResult)
+    except Exception as e:
+        logger.error("%s error reviewing batch: %s", reviewer_name, e)
+        return None
+
+    if batch is None:
+        return None
+
+    return {
+        entry.filename: ReviewResult(findings=entry.findings)
+        for entry in batch.per_file
+    }
+
+
+async def analyze_code_batch(
+    files: list[tuple[str, str]],
+    model: str = DEFAULT_MODEL,
+) -> dict[str, ReviewResult] | None:
+    """General review (bugs, performance, style) of several small files."""
+    logger.info("  🔍 General review: batch of %d files", len(files))
+    return await _review_batch_with_prompt(files, REVIEW_PROMPT, "general", model)
+
+
+async def security_review_batch(
+    files: list[tuple[str, str]],
+    model: str = DEFAULT_MODEL,
+) -> dict[str, ReviewResult] | None:
+    """Security review of several small files in one request."""
+    logger.info("  🔒 Security review: batch of %d files", len(files))
+    return await _review_batch_with_prompt(files, SECURITY_PROMPT, "security", model)
+
+
+async def quality_review_batch(
+    files: list[tuple[str, str]],
+    model: str = DEFAULT_MODEL,
+) -> dict[str, ReviewResult] | None:
+    """Quality review of several small files in one request."""
+    logger.info("  📐 Quality review: batch of %d files", len(files))
+    return await _review_batch_with_prompt(files, QUALITY_PROMPT, "quality", model)